@@ -0,0 +1,226 @@
+import os
+import re
+import sys
+import glob
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import yaml
+import shapely
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.patches import PathPatch
+from matplotlib.path import Path as MplPath
+from shapely.geometry import Polygon
+
+
+# === 参数设置 ===
+figsize = (8, 8)     # 预览图尺寸（英寸）
+dpi = 100            # 预览图分辨率
+margin = 0.05        # 田块四周留白比例
+max_linewidth = 2    # 路径线宽上限（磅）
+
+# s_rote.py 直接用 str() 写出路径点，文件里可能出现 np.float64(...) 包裹的数值
+_np_float_pattern = re.compile(r'np\.float64\(([^()]*)\)')
+
+
+# === 数据读取模块 ===
+def load_path_yaml(yaml_file):
+    with open(yaml_file, 'r') as file:
+        text = _np_float_pattern.sub(r'\1', file.read())
+    return [(float(x), float(y)) for x, y in yaml.safe_load(text)]
+
+def load_plan(plan_file):
+    # 规划文件格式: or_points / working_wide / path（或 path_file，相对规划文件所在目录）
+    with open(plan_file, 'r') as file:
+        plan = yaml.safe_load(file)
+    if not isinstance(plan, dict):
+        raise ValueError(f"{plan_file}: plan must be a mapping with 'or_points' and 'working_wide'.")
+    if 'path' in plan:
+        path = [(float(x), float(y)) for x, y in plan['path']]
+    elif 'path_file' in plan:
+        path_file = os.path.join(os.path.dirname(plan_file), plan['path_file'])
+        path = load_path_yaml(path_file)
+    else:
+        raise ValueError(f"{plan_file}: plan must contain 'path' or 'path_file'.")
+    field_vertices = [(float(x), float(y)) for x, y in plan['or_points']]
+
+    # 检查路径与田块是否有效，避免后续覆盖率计算除零或数组维度出错
+    if len(path) < 2:
+        raise ValueError(f"{plan_file}: path must contain at least 2 points.")
+    if len(field_vertices) < 3 or Polygon(field_vertices).area == 0:
+        raise ValueError(f"{plan_file}: or_points must form a polygon with non-zero area.")
+    return field_vertices, path, float(plan['working_wide'])
+
+
+def is_plan_file(yaml_file):
+    # 目录中的路径文件（如 a.yaml）与规划文件放在一起，只挑出含 or_points / working_wide 的映射
+    try:
+        with open(yaml_file, 'r') as file:
+            data = yaml.safe_load(file)
+    except yaml.YAMLError:
+        return True  # 交给 load_plan 报告具体错误
+    return isinstance(data, dict) and 'or_points' in data and 'working_wide' in data
+
+
+# === 覆盖区域计算 ===
+def covered_polygon(field_vertices, path, width):
+    # 与 s_rote.path_to_polygon 相同的逐段矩形并集；直线段上的插值点不改变几何形状，这里省去插值
+    pts = np.asarray(path, dtype=float)
+    # 去掉重复点，再合并同向共线的相邻线段（矩形并集不变，参与合并的矩形更少）
+    pts = pts[np.r_[True, np.any(np.diff(pts, axis=0) != 0, axis=1)]]
+    if len(pts) >= 3:
+        d1, d2 = pts[1:-1] - pts[:-2], pts[2:] - pts[1:-1]
+        cross = d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0]
+        dot = np.einsum('ij,ij->i', d1, d2)
+        scale = np.hypot(d1[:, 0], d1[:, 1]) * np.hypot(d2[:, 0], d2[:, 1])
+        straight = (np.abs(cross) <= 1e-9 * scale) & (dot > 0)
+        pts = pts[np.r_[True, ~straight, True]]
+
+    field_polygon = Polygon(field_vertices)
+    if len(pts) < 2:
+        covered_area = Polygon()
+    else:
+        a, b = pts[:-1], pts[1:]
+        d = b - a
+        offset = np.column_stack((-d[:, 1], d[:, 0])) / np.hypot(d[:, 0], d[:, 1])[:, None] * (width / 2)
+        rectangles = shapely.polygons(np.stack((a + offset, a - offset, b - offset, b + offset), axis=1))
+        covered_area = shapely.union_all(rectangles).intersection(field_polygon)
+    coverage = covered_area.area / field_polygon.area * 100
+    return coverage, covered_area
+
+def polygon_to_path(geometry):
+    # 把（多）多边形连同内部空洞合成一个复合 Path，一次性填充
+    parts = getattr(geometry, 'geoms', [geometry])
+    vertices, codes = [], []
+    for part in parts:
+        if not isinstance(part, Polygon) or part.is_empty:
+            continue
+        for ring in [part.exterior] + list(part.interiors):
+            ring_xy = np.asarray(ring.coords)
+            vertices.append(ring_xy)
+            ring_codes = np.full(len(ring_xy), MplPath.LINETO, dtype=MplPath.code_type)
+            ring_codes[0] = MplPath.MOVETO
+            ring_codes[-1] = MplPath.CLOSEPOLY
+            codes.append(ring_codes)
+    if not vertices:
+        return None
+    return MplPath(np.concatenate(vertices), np.concatenate(codes))
+
+
+# === 绘制模块 ===
+def decimate(points, transform):
+    # 按像素分辨率抽稀：相邻点落在同一像素内时只保留第一个，首尾点始终保留
+    pts = np.asarray(points, dtype=float)
+    if len(pts) < 3:
+        return pts
+    pixels = np.round(transform.transform(pts)).astype(np.int64)
+    keep = np.ones(len(pts), dtype=bool)
+    keep[1:] = np.any(pixels[1:] != pixels[:-1], axis=1)
+    keep[-1] = True
+    return pts[keep]
+
+def render_preview(field_vertices, path, width, out_png):
+    # 不经过 pyplot，直接使用 Agg 画布，无需显示器，可在子进程中安全运行
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    fig.subplots_adjust(bottom=0.2)  # 图例放在坐标轴下方，不遮挡田块
+
+    coverage, covered_area = covered_polygon(field_vertices, path, width)
+
+    field_xy = np.asarray(list(field_vertices) + [field_vertices[0]], dtype=float)
+    all_xy = np.vstack((field_xy, np.asarray(path, dtype=float)))
+    (xmin, ymin), (xmax, ymax) = all_xy.min(axis=0), all_xy.max(axis=0)
+    pad = max(xmax - xmin, ymax - ymin) * margin
+    ax.set_xlim(xmin - pad, xmax + pad)
+    ax.set_ylim(ymin - pad, ymax + pad)
+    ax.set_aspect('equal')
+    ax.apply_aspect()  # 先确定坐标到像素的变换，抽稀才有依据
+    (x0, _), (x1, _) = ax.transData.transform([(0.0, 0.0), (1.0, 0.0)])
+    pixels_per_metre = abs(x1 - x0)
+
+    # 视野范围已固定，以下图形均不再参与自动缩放计算
+    handles = ax.fill(field_xy[:, 0], field_xy[:, 1], color='green', alpha=0.5, label='Field Area')
+
+    # 覆盖区域按一个像素的精度简化后再绘制，覆盖率仍按未简化的结果计算
+    covered_path = polygon_to_path(covered_area.simplify(1 / pixels_per_metre))
+    if covered_path is not None:
+        covered_patch = PathPatch(covered_path, facecolor='black', edgecolor='none', alpha=0.2,
+                                  label='Covered Area')
+        ax.add_artist(covered_patch)
+        handles.append(covered_patch)
+
+    path_xy = decimate(path, ax.transData)
+    segments = np.stack((path_xy[:-1], path_xy[1:]), axis=1)
+    # 线宽取相邻作业行间距（像素）的一半，大田块上各行不会糊成一片
+    linewidth = min(max_linewidth, width * pixels_per_metre / 2 * 72 / dpi)
+    path_lines = LineCollection(segments, colors='black', linewidths=linewidth, label='Path')
+    ax.add_collection(path_lines, autolim=False)
+    handles.append(path_lines)
+
+    ax.set_title(f'Field Coverage Rate: {coverage:.2f}%', fontsize=16)
+    ax.set_xlabel('X/m', fontsize=16)
+    ax.set_ylabel('Y/m', fontsize=16)
+    fig.legend(handles=handles, loc='lower center', ncol=3, fontsize=12)
+    ax.grid(True)
+    fig.savefig(out_png)
+    return coverage
+
+
+# === 批量渲染模块 ===
+def _render_plan_file(plan_file, out_png):
+    field_vertices, path, width = load_plan(plan_file)
+    return render_preview(field_vertices, path, width, out_png)
+
+def render_batch(plan_files, out_dir, workers=None):
+    # 每个田块在独立的工作进程中渲染；单个田块出错不影响其余田块
+    # 返回 ({规划文件: 覆盖率}, {规划文件: 异常})
+    os.makedirs(out_dir, exist_ok=True)
+    results, errors = {}, {}
+    if not plan_files:
+        return results, errors
+    # 输出文件名取相对公共目录的路径，不同目录下的同名规划不会互相覆盖
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(plan_file)) for plan_file in plan_files])
+    out_owner = {}
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        futures = {}
+        for plan_file in plan_files:
+            relative = os.path.relpath(os.path.abspath(plan_file), root)
+            out_png = os.path.join(out_dir, os.path.splitext(relative)[0].replace(os.sep, '__') + '.png')
+            if out_png in out_owner:
+                errors[plan_file] = ValueError(f"{plan_file}: output {out_png} already used by {out_owner[out_png]}.")
+                continue
+            out_owner[out_png] = plan_file
+            futures[executor.submit(_render_plan_file, plan_file, out_png)] = plan_file
+        for future in as_completed(futures):
+            plan_file = futures[future]
+            try:
+                results[plan_file] = future.result()
+            except Exception as error:
+                errors[plan_file] = error
+    return results, errors
+
+
+# === 主流程 ===
+def main():
+    parser = argparse.ArgumentParser(description='批量生成规划路径预览图（PNG，无需显示器）')
+    parser.add_argument('plan_dir', help='规划文件（*.yaml）所在目录')
+    parser.add_argument('out_dir', help='预览图输出目录')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='工作进程数，默认等于 CPU 核数')
+    args = parser.parse_args()
+
+    yaml_files = sorted(glob.glob(os.path.join(args.plan_dir, '*.yaml')))
+    plan_files = [yaml_file for yaml_file in yaml_files if is_plan_file(yaml_file)]
+    results, errors = render_batch(plan_files, args.out_dir, args.workers)
+    for plan_file in sorted(results):
+        print(f"{os.path.basename(plan_file)} 覆盖率: {results[plan_file]:.2f}%")
+    for plan_file in sorted(errors):
+        print(f"{os.path.basename(plan_file)} 渲染失败: {errors[plan_file]!r}", file=sys.stderr)
+    if errors:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()